@@ -1,17 +1,45 @@
+import atexit
+import bisect
 import csv
+import gc
 import hashlib
+import io
+import itertools
 import os
 import sys
-import time
-from datetime import datetime, timedelta
-
-from PySide6.QtCore import QBuffer, QByteArray, QIODevice, Qt, QThread, QUrl, Signal
-from PySide6.QtGui import QDesktopServices, QIcon, QImage, QPixmap
+from collections import defaultdict, deque, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+
+from PySide6.QtCore import (
+    QAbstractListModel,
+    QModelIndex,
+    QObject,
+    QRect,
+    QRunnable,
+    QSize,
+    Qt,
+    QThreadPool,
+    QTimer,
+    QUrl,
+    Signal,
+)
+from PySide6.QtGui import (
+    QDesktopServices,
+    QIcon,
+    QImage,
+    QImageIOHandler,
+    QImageReader,
+    QPixmap,
+    QPixmapCache,
+)
 from PySide6.QtWidgets import (
     QApplication,
     QHBoxLayout,
     QLabel,
     QLineEdit,
+    QListView,
     QListWidget,
     QListWidgetItem,
     QMainWindow,
@@ -19,185 +47,743 @@ from PySide6.QtWidgets import (
     QMessageBox,
     QPushButton,
     QStyle,
+    QStyledItemDelegate,
     QSystemTrayIcon,
     QVBoxLayout,
     QWidget,
 )
 
-POLL_INTERVAL_SECONDS = 1
 ICON_FILE = "icon.png"
+APP_ICON_SIZES = (16, 32, 64)
+CSV_BUFFER_SIZE = 64 * 1024
+CSV_BULK_BUFFER_SIZE = 1 << 20
+CSV_FLUSH_EVERY_ROWS = 16
+CSV_FLUSH_INTERVAL_MS = 2000
+CSV_COMPACT_DEAD_ROW_RATIO = 0.25
+DELETE_DATE_MARKER = "__delete_date__"
+THUMBNAIL_WIDTH = 200
+THUMBNAIL_CACHE_COUNT = 128
+ITEM_PADDING = 5
+SEARCH_DEBOUNCE_MS = 150
+REFRESH_COALESCE_MS = 100
+CLIPBOARD_COALESCE_MS = 50
+IMAGE_DELETE_WORKERS = 8
+FULL_IMAGE_CACHE_SIZE = 8
+ASYNC_IMAGE_LOAD_BYTES = 1024 * 1024
+FALLBACK_POLL_INTERVAL_MS = 1000
+FALLBACK_IMAGE_POLL_EVERY_TICKS = 5
+# Qt maps PNG quality 80 to zlib level 1: faster saves for slightly larger files.
+IMAGE_PNG_QUALITY = 80
+
+HistoryRow = namedtuple("HistoryRow", ["timestamp_iso", "item_type", "content"])
+
+
+@lru_cache(maxsize=FULL_IMAGE_CACHE_SIZE)
+def load_full_image(filepath, mtime_ns):
+    return QImage(filepath)
 
 
 class HistoryManager:
-    def __init__(self, csv_path, images_dir):
+    def __init__(self, csv_path, images_dir, thumbs_dir):
         self.csv_path = csv_path
         self.images_dir = images_dir
-        self.history = {}
+        self.thumbs_dir = thumbs_dir
+        self.history = defaultdict(deque)
+        self._thumbnail_sizes = {}
+        self._source_mtimes = {}
+        self._date_label_cache = {}
+        self._search_rows = []
+        self._search_texts = []
+        self._last_search = None
+        self._csv_file = None
+        self._csv_writer = None
+        self._rows_since_flush = 0
+        self._flush_timer = QTimer()
+        self._flush_timer.setSingleShot(True)
+        self._flush_timer.setInterval(CSV_FLUSH_INTERVAL_MS)
+        self._flush_timer.timeout.connect(self.flush)
+        self._csv_row_count = 0
+        self._dead_row_count = 0
+        self._load_incomplete = False
         os.makedirs(self.images_dir, exist_ok=True)
+        os.makedirs(self.thumbs_dir, exist_ok=True)
+        QPixmapCache.setCacheLimit(max(
+            QPixmapCache.cacheLimit(),
+            THUMBNAIL_CACHE_COUNT * THUMBNAIL_WIDTH * THUMBNAIL_WIDTH * 4 // 1024))
         self._load_history_from_csv()
+        self._rebuild_search_index()
+        self._open_csv_for_append()
+        atexit.register(self.close)
 
     def _load_history_from_csv(self):
         if not os.path.exists(self.csv_path):
             return
+        history = self.history
+        intern = sys.intern
+        date_keys = {}
+        row_count = dead_row_count = 0
+        gc_was_enabled = gc.isenabled()
+        gc.disable()
         try:
-            with open(self.csv_path, 'r', newline='', encoding='utf-8') as f:
-                reader = csv.reader(f)
-                for row in reader:
-                    if len(row) == 3:
+            with open(self.csv_path, 'r', newline='', encoding='utf-8',
+                      buffering=CSV_BULK_BUFFER_SIZE) as f:
+                for row in csv.reader(f):
+                    row_count += 1
+                    try:
                         timestamp_iso, item_type, content = row
-                        self._add_item_to_memory(
-                            timestamp_iso, item_type, content)
+                        if item_type == DELETE_DATE_MARKER:
+                            deleted = history.pop(date.fromisoformat(content), ())
+                            dead_row_count += 1 + len(deleted)
+                            continue
+                        day = timestamp_iso[:10]
+                        item_date = date_keys.get(day)
+                        if item_date is None:
+                            item_date = date_keys[day] = date.fromisoformat(day)
+                    except ValueError:
+                        dead_row_count += 1
+                        continue
+                    history[item_date].appendleft(
+                        HistoryRow(timestamp_iso, intern(item_type), content))
         except Exception as e:
             print(f"Error loading history from CSV: {e}")
+            # Rewriting from a partial load would drop the unread rows.
+            self._load_incomplete = True
+        finally:
+            if gc_was_enabled:
+                gc.enable()
+        self._csv_row_count = row_count
+        self._dead_row_count = dead_row_count
 
     def _add_item_to_memory(self, timestamp_iso, item_type, content):
-        timestamp = datetime.fromisoformat(timestamp_iso)
-        item_date = timestamp.date()
-        if item_date not in self.history:
-            self.history[item_date] = []
-        self.history[item_date].insert(0, (timestamp_iso, item_type, content))
+        item_date = date.fromisoformat(timestamp_iso[:10])
+        item_type = sys.intern(item_type)
+        row = HistoryRow(timestamp_iso, item_type, content)
+        self.history[item_date].appendleft(row)
+        if item_type == "text":
+            self._index_for_search(row)
+        return item_date
+
+    def _index_for_search(self, row):
+        self._last_search = None
+        content_lower = row.content.lower()
+        self._search_rows.append(row)
+        self._search_texts.append(
+            row.content if content_lower == row.content else content_lower)
+
+    def _rebuild_search_index(self):
+        self._search_rows = []
+        self._search_texts = []
+        self._last_search = None
+        for date_key in sorted(self.history.keys()):
+            for row in reversed(self.history[date_key]):
+                if row.item_type == "text":
+                    self._index_for_search(row)
+
+    def search_text(self, query):
+        query_lower = query.lower()
+        if self._last_search is not None and self._last_search[0] in query_lower:
+            # Anything matching the longer query also matched the previous one.
+            candidates = self._last_search[1]
+        else:
+            candidates = zip(reversed(self._search_texts), reversed(self._search_rows))
+        matches = [(content_lower, row) for content_lower, row in candidates
+                   if query_lower in content_lower]
+        self._last_search = (query_lower, matches)
+        return [row for _, row in matches]
 
     def add_item(self, timestamp_iso, item_type, content):
-        timestamp = datetime.fromisoformat(timestamp_iso)
-        item_date = timestamp.date()
-        if item_date not in self.history:
-            self.history[item_date] = []
-        self.history[item_date].insert(0, (timestamp_iso, item_type, content))
+        item_date = self._add_item_to_memory(timestamp_iso, item_type, content)
         self._append_to_csv(timestamp_iso, item_type, content)
         return item_date
 
+    def _open_csv_for_append(self):
+        try:
+            self._csv_file = open(self.csv_path, 'a', newline='', encoding='utf-8',
+                                  buffering=CSV_BUFFER_SIZE)
+            self._csv_writer = csv.writer(self._csv_file)
+        except Exception as e:
+            print(f"Error opening CSV for writing: {e}")
+            self._csv_file = None
+            self._csv_writer = None
+
     def _append_to_csv(self, timestamp_iso, item_type, content):
+        if self._csv_writer is None:
+            self._open_csv_for_append()
+            if self._csv_writer is None:
+                return False
         try:
-            with open(self.csv_path, 'a', newline='', encoding='utf-8') as f:
-                writer = csv.writer(f)
-                writer.writerow([timestamp_iso, item_type, content])
+            self._csv_writer.writerow([timestamp_iso, item_type, content])
+            self._csv_row_count += 1
+            self._rows_since_flush += 1
+            if self._rows_since_flush >= CSV_FLUSH_EVERY_ROWS:
+                return self.flush()
+            if not self._flush_timer.isActive():
+                self._flush_timer.start()
+            return True
         except Exception as e:
             print(f"Error writing to CSV: {e}")
+            return False
+
+    def flush(self):
+        if self._flush_timer.isActive():
+            self._flush_timer.stop()
+        if self._csv_file is None:
+            return False
+        try:
+            self._csv_file.flush()
+            self._rows_since_flush = 0
+            return True
+        except Exception as e:
+            print(f"Error flushing CSV: {e}")
+            return False
+
+    def close(self):
+        if self._csv_file is None:
+            return
+        self._compact_if_needed()
+        self._close_csv()
+
+    def _close_csv(self):
+        if self._csv_file is None:
+            return
+        self.flush()
+        try:
+            self._csv_file.close()
+        except Exception as e:
+            print(f"Error closing CSV: {e}")
+        self._csv_file = None
+        self._csv_writer = None
 
     def _rewrite_csv(self):
+        if self._load_incomplete:
+            print("Not rewriting the history file: it was only partially loaded.")
+            return False
         temp_path = self.csv_path + ".tmp"
+        self._close_csv()
         try:
-            with open(temp_path, 'w', newline='', encoding='utf-8') as f:
+            with open(temp_path, 'w', newline='', encoding='utf-8',
+                      buffering=CSV_BULK_BUFFER_SIZE) as f:
                 writer = csv.writer(f)
-                all_items = []
-                for date_key in sorted(self.history.keys()):
-                    all_items.extend(reversed(self.history[date_key]))
-                writer.writerows(all_items)
+                writer.writerows(itertools.chain.from_iterable(
+                    reversed(self.history[date_key])
+                    for date_key in sorted(self.history.keys())))
             os.replace(temp_path, self.csv_path)
+            self._csv_row_count = sum(len(items) for items in self.history.values())
+            self._dead_row_count = 0
             return True
         except Exception as e:
             print(f"FATAL: Error rewriting CSV file: {e}")
             if os.path.exists(temp_path):
                 os.remove(temp_path)
             return False
+        finally:
+            self._open_csv_for_append()
 
     def get_history_for_date(self, date):
         return self.history.get(date, [])
 
+    def get_displayable_history_for_date(self, date):
+        date_history = self.get_history_for_date(date)
+        if not any(row.item_type == "image" for row in date_history):
+            return list(date_history)
+
+        try:
+            with os.scandir(self.images_dir) as entries:
+                existing_images = {entry.path for entry in entries}
+        except OSError:
+            existing_images = set()
+
+        def image_exists(path):
+            if path in existing_images:
+                return True
+            return (os.path.dirname(path) != self.images_dir
+                    and os.path.exists(path))
+
+        return [row for row in date_history
+                if row.item_type == "text"
+                or (row.item_type == "image" and image_exists(row.content))]
+
     def get_all_dates(self):
         return sorted(self.history.keys(), reverse=True)
 
+    def label_for(self, date_obj):
+        label = self._date_label_cache.get(date_obj)
+        if label is None:
+            label = self._date_label_cache[date_obj] = date_obj.strftime("%b %d, %Y")
+        return label
+
+    def _thumbnail_path(self, filepath):
+        return os.path.join(self.thumbs_dir, os.path.basename(filepath))
+
+    @staticmethod
+    def _thumbnail_cache_key(filepath, source_mtime):
+        return f"{filepath}:{source_mtime}"
+
+    def write_thumbnail(self, filepath, image):
+        thumb = self.downscale_image(image, self._thumbnail_size_for(image.size()))
+        thumb_path = self._thumbnail_path(filepath)
+        if not thumb.save(thumb_path, "PNG"):
+            print(f"Error saving thumbnail {thumb_path}")
+            return QImage()
+        return thumb
+
+    def _source_mtime(self, filepath):
+        source_mtime = self._source_mtimes.get(filepath)
+        if source_mtime is None:
+            try:
+                source_mtime = os.stat(filepath).st_mtime_ns
+            except OSError:
+                return None
+            self._source_mtimes[filepath] = source_mtime
+        return source_mtime
+
+    def cache_thumbnail(self, filepath, thumb):
+        self._thumbnail_sizes[filepath] = thumb.size()
+        source_mtime = self._source_mtime(filepath)
+        if source_mtime is None:
+            return
+        QPixmapCache.insert(
+            self._thumbnail_cache_key(filepath, source_mtime), QPixmap.fromImage(thumb))
+
+    def get_thumbnail(self, filepath):
+        source_mtime = self._source_mtime(filepath)
+        if source_mtime is None:
+            return QPixmap()
+        cache_key = self._thumbnail_cache_key(filepath, source_mtime)
+        pixmap = QPixmapCache.find(cache_key)
+        if pixmap is not None:
+            return pixmap
+
+        thumb_path = self._thumbnail_path(filepath)
+        try:
+            thumb_is_fresh = os.stat(thumb_path).st_mtime_ns >= source_mtime
+        except OSError:
+            thumb_is_fresh = False
+
+        pixmap = QPixmap(thumb_path) if thumb_is_fresh else QPixmap()
+        if pixmap.isNull():
+            pixmap = QPixmap.fromImage(self._read_scaled_image(filepath))
+            if not pixmap.isNull() and not pixmap.save(thumb_path, "PNG"):
+                print(f"Error saving thumbnail {thumb_path}")
+        elif pixmap.width() != THUMBNAIL_WIDTH:
+            pixmap = pixmap.scaledToWidth(
+                THUMBNAIL_WIDTH, Qt.TransformationMode.FastTransformation)
+
+        if not pixmap.isNull():
+            QPixmapCache.insert(cache_key, pixmap)
+        return pixmap
+
+    @staticmethod
+    def _thumbnail_size_for(source_size):
+        return QSize(THUMBNAIL_WIDTH, max(1, round(
+            source_size.height() * THUMBNAIL_WIDTH / source_size.width())))
+
+    def get_thumbnail_size(self, filepath):
+        size = self._thumbnail_sizes.get(filepath)
+        if size is None:
+            source_size = QImageReader(filepath).size()
+            if source_size.isValid() and source_size.width() > 0:
+                size = self._thumbnail_size_for(source_size)
+            else:
+                size = self.get_thumbnail(filepath).size()
+            self._thumbnail_sizes[filepath] = size
+        return size
+
+    def _read_scaled_image(self, filepath):
+        reader = QImageReader(filepath)
+        source_size = reader.size()
+        if (source_size.isValid() and source_size.width() > 0
+                and reader.supportsOption(QImageIOHandler.ImageOption.ScaledSize)):
+            reader.setScaledSize(self._thumbnail_size_for(source_size))
+            image = reader.read()
+        else:
+            image = reader.read()
+            if not image.isNull():
+                image = self.downscale_image(
+                    image, self._thumbnail_size_for(image.size()))
+        if image.isNull():
+            print(f"Error reading image {filepath}: {reader.errorString()}")
+        return image
+
+    @staticmethod
+    def downscale_image(image, target_size):
+        if image.size() == target_size:
+            return image
+        if image.width() > 2 * target_size.width():
+            image = image.scaled(
+                target_size * 2, Qt.AspectRatioMode.IgnoreAspectRatio,
+                Qt.TransformationMode.FastTransformation)
+        return image.scaled(
+            target_size, Qt.AspectRatioMode.IgnoreAspectRatio,
+            Qt.TransformationMode.SmoothTransformation)
+
+    def _image_file_paths(self, history_items):
+        for row in history_items:
+            if row.item_type == "image":
+                yield row.content
+                yield self._thumbnail_path(row.content)
+
+    @staticmethod
+    def _delete_file(path):
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            print(f"Error deleting image file {path}: {e}")
+
+    def _forget_thumbnails(self, history_items):
+        for row in history_items:
+            if row.item_type != "image":
+                continue
+            self._thumbnail_sizes.pop(row.content, None)
+            source_mtime = self._source_mtimes.pop(row.content, None)
+            if source_mtime is not None:
+                QPixmapCache.remove(self._thumbnail_cache_key(row.content, source_mtime))
+        load_full_image.cache_clear()
+
+    def discard_image_item(self, timestamp_iso, filepath):
+        item_date = date.fromisoformat(timestamp_iso[:10])
+        rows = self.history.get(item_date)
+        if rows is None:
+            return
+        try:
+            rows.remove(HistoryRow(timestamp_iso, "image", filepath))
+        except ValueError:
+            return
+        if not rows:
+            del self.history[item_date]
+        # The CSV row stays until compaction; the view already hides missing images.
+        self._dead_row_count += 1
+        self._compact_if_needed()
+
+    def has_image(self, timestamp_iso, filepath):
+        rows = self.history.get(date.fromisoformat(timestamp_iso[:10]), ())
+        return any(row.content == filepath for row in rows)
+
+    def delete_image(self, filepath):
+        self._delete_image_files([HistoryRow("", "image", filepath)])
+
     def _delete_image_files(self, history_items):
-        for _, item_type, content in history_items:
-            if item_type == "image":
-                try:
-                    if os.path.exists(content):
-                        os.remove(content)
-                except OSError as e:
-                    print(f"Error deleting image file {content}: {e}")
+        for path in self._image_file_paths(history_items):
+            self._delete_file(path)
 
     def clear_date(self, date_to_clear):
         if date_to_clear not in self.history:
             print(f"Error: Could not find the date {date_to_clear} in the history dictionary.")
             return False
 
+        if not self._write_tombstone(date_to_clear):
+            print("CRITICAL: CSV tombstone write failed. Keeping the date in history.")
+            return False
+
         items_to_delete = self.history.pop(date_to_clear)
+        self._dead_row_count += 1 + len(items_to_delete)
+        self._rebuild_search_index()
+        self._forget_thumbnails(items_to_delete)
         self._delete_image_files(items_to_delete)
+        self._compact_if_needed()
+        return True
 
-        if self._rewrite_csv():
-            return True
-        else:
-            print("CRITICAL: CSV rewrite failed. Rolling back in-memory deletion.")
-            self.history[date_to_clear] = items_to_delete
+    def _write_tombstone(self, date_to_clear):
+        # Rows still buffered for this date must land before its tombstone.
+        if not self.flush():
+            return False
+        line = io.StringIO()
+        csv.writer(line).writerow(
+            [datetime.now().isoformat(), DELETE_DATE_MARKER, date_to_clear.isoformat()])
+        # Unbuffered, so a failed write cannot leave the tombstone pending in a buffer.
+        try:
+            with open(self.csv_path, 'ab', buffering=0) as csv_file:
+                csv_file.write(line.getvalue().encode('utf-8'))
+        except Exception as e:
+            print(f"Error writing to CSV: {e}")
             return False
+        self._csv_row_count += 1
+        return True
+
+    def _compact_if_needed(self):
+        if self._load_incomplete:
+            return
+        if self._dead_row_count > self._csv_row_count * CSV_COMPACT_DEAD_ROW_RATIO:
+            self._rewrite_csv()
 
     def clear_all(self):
-        for date_items in self.history.values():
-            self._delete_image_files(date_items)
+        paths = [path for date_items in self.history.values()
+                 for path in self._image_file_paths(date_items)]
+        if paths:
+            with ThreadPoolExecutor(max_workers=IMAGE_DELETE_WORKERS) as executor:
+                executor.map(self._delete_file, paths)
+        self._thumbnail_sizes.clear()
+        self._source_mtimes.clear()
+        QPixmapCache.clear()
+        load_full_image.cache_clear()
         self.history.clear()
+        self._search_rows.clear()
+        self._search_texts.clear()
+        self._last_search = None
+        # Clearing everything is the one rewrite that cannot lose unread rows.
+        self._load_incomplete = False
         self._rewrite_csv()
 
 
-class ClipboardMonitor(QThread):
+class ImageLoadSignals(QObject):
+    loaded = Signal(int, str, QImage)
+
+
+class ImageLoadTask(QRunnable):
+    def __init__(self, copy_token, filepath, mtime_ns):
+        super().__init__()
+        self.copy_token = copy_token
+        self.filepath = filepath
+        self.mtime_ns = mtime_ns
+        self.signals = ImageLoadSignals()
+
+    def run(self):
+        self.signals.loaded.emit(
+            self.copy_token, self.filepath, load_full_image(self.filepath, self.mtime_ns))
+
+
+class ImageSaveSignals(QObject):
+    saved = Signal(str, str, QImage)
+    failed = Signal(str, str)
+
+
+class ImageSaveTask(QRunnable):
+    def __init__(self, history_manager, image, timestamp_iso, filepath):
+        super().__init__()
+        self.history_manager = history_manager
+        self.image = image
+        self.timestamp_iso = timestamp_iso
+        self.filepath = filepath
+        self.signals = ImageSaveSignals()
+
+    def run(self):
+        # Write under a temporary name so the view never sees a partial PNG.
+        temp_path = self.filepath + ".tmp"
+        try:
+            if not self.image.save(temp_path, "PNG", IMAGE_PNG_QUALITY):
+                raise OSError("could not encode image")
+            thumb = self.history_manager.write_thumbnail(self.filepath, self.image)
+            os.replace(temp_path, self.filepath)
+        except OSError as e:
+            print(f"Error saving clipboard image {self.filepath}: {e}")
+            HistoryManager._delete_file(temp_path)
+            self.signals.failed.emit(self.timestamp_iso, self.filepath)
+            return
+        self.signals.saved.emit(self.timestamp_iso, self.filepath, thumb)
+
+
+class ClipboardMonitor(QObject):
     newItem = Signal(str, str, str)
 
     def __init__(self, history_manager, images_dir):
         super().__init__()
         self.history_manager = history_manager
         self.images_dir = images_dir
-        self.running = True
         self.recent_text = ""
         self.recent_image_hash = ""
-
-    def run(self):
+        self.recent_image_cache_key = 0
+        self._image_save_signals = set()
+        # Apps often publish several MIME formats in a row; only read the final state.
+        self._coalesce_timer = QTimer(self)
+        self._coalesce_timer.setSingleShot(True)
+        self._coalesce_timer.setInterval(CLIPBOARD_COALESCE_MS)
+        self._coalesce_timer.timeout.connect(self.on_clipboard_changed)
+        QApplication.clipboard().dataChanged.connect(self._coalesce_timer.start)
+        if sys.platform == "darwin":
+            # Qt on macOS only reports other apps' clipboard changes on activation,
+            # so poll, skipping whatever was on the clipboard at startup.
+            self._poll_formats = []
+            self._poll_ticks = 0
+            self._prime_recent_state()
+            self._poll_timer = QTimer(self)
+            self._poll_timer.timeout.connect(self._on_poll_tick)
+            self._poll_timer.start(FALLBACK_POLL_INTERVAL_MS)
+
+    def _prime_recent_state(self):
         try:
             clipboard = QApplication.clipboard()
             mime_data = clipboard.mimeData()
+            self._poll_formats = mime_data.formats()
             if mime_data.hasImage():
                 image = clipboard.image()
                 if not image.isNull():
-                    byte_array = QByteArray()
-                    buffer = QBuffer(byte_array)
-                    buffer.open(QIODevice.OpenModeFlag.WriteOnly)
-                    image.save(buffer, "PNG") # type: ignore
-                    self.recent_image_hash = hashlib.sha256(byte_array.data()).hexdigest()
+                    self.recent_image_cache_key = image.cacheKey()
+                    self.recent_image_hash = self._hash_image_pixels(image)
             elif mime_data.hasText():
                 self.recent_text = clipboard.text()
         except Exception as e:
             print(f"Could not prime clipboard monitor with initial state: {e}")
 
-        while self.running:
-            try:
-                clipboard = QApplication.clipboard()
-                mime_data = clipboard.mimeData()
-                if mime_data.hasImage():
-                    self.process_image(clipboard)
-                elif mime_data.hasText():
-                    self.process_text(clipboard)
-            except Exception as e:
-                print(f"Error in clipboard monitor: {e}")
-            time.sleep(POLL_INTERVAL_SECONDS)
+    def _on_poll_tick(self):
+        # The pasteboard hands back a fresh QImage on every read, so cacheKey never
+        # matches between ticks and each image check is a full decode and hash.
+        # Only do that when the offered formats change, or every few ticks.
+        self._poll_ticks += 1
+        try:
+            mime_data = QApplication.clipboard().mimeData()
+            formats = mime_data.formats()
+            formats_changed = formats != self._poll_formats
+            self._poll_formats = formats
+            if (mime_data.hasImage() and not formats_changed
+                    and self._poll_ticks % FALLBACK_IMAGE_POLL_EVERY_TICKS):
+                return
+        except Exception as e:
+            print(f"Error in clipboard monitor: {e}")
+            return
+        self.on_clipboard_changed()
+
+    def on_clipboard_changed(self):
+        try:
+            clipboard = QApplication.clipboard()
+            mime_data = clipboard.mimeData()
+            if mime_data.hasImage():
+                self.process_image(clipboard)
+            elif mime_data.hasText():
+                self.process_text(clipboard)
+        except Exception as e:
+            print(f"Error in clipboard monitor: {e}")
+
+    @staticmethod
+    def _hash_image_pixels(image):
+        digest = hashlib.blake2b(digest_size=8)
+        digest.update(f"{image.width()}x{image.height()}:{image.format()}".encode())
+        digest.update(image.constBits())
+        return digest.hexdigest()
 
     def process_image(self, clipboard):
         image = clipboard.image()
         if image.isNull():
             return
-        byte_array = QByteArray()
-        buffer = QBuffer(byte_array)
-        buffer.open(QIODevice.OpenModeFlag.WriteOnly)
-        image.save(buffer, "PNG")
-        image_hash = hashlib.sha256(byte_array.data()).hexdigest()
+        cache_key = image.cacheKey()
+        if cache_key == self.recent_image_cache_key:
+            return
+        self.recent_image_cache_key = cache_key
+        image_hash = self._hash_image_pixels(image)
 
         if image_hash != self.recent_image_hash:
             self.recent_image_hash = image_hash
-            timestamp = datetime.now()
-            filename = f"{timestamp.strftime('%Y%m%d_%H%M%S')}_{image_hash[:8]}.png"
+            timestamp_iso = datetime.now().isoformat()
+            filename = (f"{timestamp_iso[:10].replace('-', '')}_"
+                        f"{timestamp_iso[11:19].replace(':', '')}_{image_hash[:8]}.png")
             filepath = os.path.join(self.images_dir, filename)
-            image.save(filepath, "PNG")
-            self.history_manager.add_item(
-                timestamp.isoformat(), "image", filepath)
-            self.newItem.emit(timestamp.isoformat(), "image", filepath)
+            self.history_manager.add_item(timestamp_iso, "image", filepath)
+            task = ImageSaveTask(
+                self.history_manager, image, timestamp_iso, filepath)
+            task.signals.saved.connect(self.on_image_saved)
+            task.signals.failed.connect(self.on_image_save_failed)
+            self._image_save_signals.add(task.signals)
+            QThreadPool.globalInstance().start(task)
+
+    def on_image_saved(self, timestamp_iso, filepath, thumb):
+        self._image_save_signals.discard(self.sender())
+        if not self.history_manager.has_image(timestamp_iso, filepath):
+            # Its date was cleared while the save was in flight.
+            self.history_manager.delete_image(filepath)
+            return
+        if not thumb.isNull():
+            self.history_manager.cache_thumbnail(filepath, thumb)
+        self.newItem.emit(timestamp_iso, "image", filepath)
+
+    def on_image_save_failed(self, timestamp_iso, filepath):
+        self._image_save_signals.discard(self.sender())
+        self.history_manager.discard_image_item(timestamp_iso, filepath)
+        self.history_manager.delete_image(filepath)
 
     def process_text(self, clipboard):
         text = clipboard.text()
         if text and text != self.recent_text:
             self.recent_text = text
-            timestamp = datetime.now()
-            self.history_manager.add_item(timestamp.isoformat(), "text", text)
-            self.newItem.emit(timestamp.isoformat(), "text", text)
+            timestamp_iso = datetime.now().isoformat()
+            self.history_manager.add_item(timestamp_iso, "text", text)
+            self.newItem.emit(timestamp_iso, "text", text)
+
+
+class HistoryListModel(QAbstractListModel):
+    def __init__(self, history_manager, parent=None):
+        super().__init__(parent)
+        self.history_manager = history_manager
+        self._rows = []
+
+    def set_rows(self, rows):
+        self.beginResetModel()
+        self._rows = list(rows)
+        self.endResetModel()
+
+    def clear(self):
+        self.set_rows([])
+
+    def prepend_row(self, row):
+        self.beginInsertRows(QModelIndex(), 0, 0)
+        self._rows.insert(0, row)
+        self.endInsertRows()
 
-    def stop(self):
-        self.running = False
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        row = self._rows[index.row()]
+        item_type, content = row.item_type, row.content
+
+        if role == Qt.ItemDataRole.DisplayRole:
+            item_time = row.timestamp_iso[11:19]
+            if item_type == "image":
+                return f"[{item_time}]"
+            display_text = (
+                content[:100] + '...') if len(content) > 100 else content
+            return f"[{item_time}]\n{display_text.strip()}"
+        if role == Qt.ItemDataRole.DecorationRole and item_type == "image":
+            return self.history_manager.get_thumbnail(content)
+        if role == Qt.ItemDataRole.ToolTipRole:
+            return "Double-click to copy image" if item_type == "image" else content
+        if role == Qt.ItemDataRole.UserRole:
+            return (item_type, content)
+        return None
+
+
+class HistoryItemDelegate(QStyledItemDelegate):
+    def __init__(self, history_manager, parent=None):
+        super().__init__(parent)
+        self.history_manager = history_manager
+
+    def paint(self, painter, option, index):
+        item_type, _ = index.data(Qt.ItemDataRole.UserRole)
+        if item_type != "image":
+            super().paint(painter, option, index)
+            return
+
+        style = option.widget.style() if option.widget else QApplication.style()
+        style.drawPrimitive(
+            QStyle.PrimitiveElement.PE_PanelItemViewItem, option, painter, option.widget)
+
+        rect = option.rect.adjusted(
+            ITEM_PADDING, ITEM_PADDING, -ITEM_PADDING, -ITEM_PADDING)
+        line_height = option.fontMetrics.height()
+        painter.save()
+        if option.state & QStyle.StateFlag.State_Selected:
+            painter.setPen(option.palette.highlightedText().color())
+        painter.drawText(
+            QRect(rect.left(), rect.top(), rect.width(), line_height),
+            Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter,
+            index.data(Qt.ItemDataRole.DisplayRole))
+        pixmap = index.data(Qt.ItemDataRole.DecorationRole)
+        if pixmap is not None and not pixmap.isNull():
+            painter.drawPixmap(
+                rect.left(), rect.top() + line_height + ITEM_PADDING, pixmap)
+        painter.restore()
+
+    def sizeHint(self, option, index):
+        item_type, content = index.data(Qt.ItemDataRole.UserRole)
+        if item_type != "image":
+            return super().sizeHint(option, index)
+        thumb_size = self.history_manager.get_thumbnail_size(content)
+        line_height = option.fontMetrics.height()
+        return QSize(
+            thumb_size.width() + 2 * ITEM_PADDING,
+            line_height + thumb_size.height() + 3 * ITEM_PADDING)
 
 
 class ClipboardMainWindow(QMainWindow):
@@ -210,7 +796,7 @@ class ClipboardMainWindow(QMainWindow):
         self.setMinimumSize(600, 400)
 
         if os.path.exists(ICON_FILE):
-            self.app_icon = QIcon(ICON_FILE)
+            self.app_icon = self._load_app_icon(ICON_FILE)
         else:
             print(
                 f"Warning: Icon file '{ICON_FILE}' not found. Using default icon.")
@@ -218,9 +804,35 @@ class ClipboardMainWindow(QMainWindow):
                 QStyle.StandardPixmap.SP_ComputerIcon)
         self.setWindowIcon(self.app_icon)
 
+        self._today = datetime.now().date()
+        self._known_dates = set()
+        self._date_order = []
+        self._image_load_signals = set()
+        self._image_copy_token = 0
+        self._pending_items = []
+        self._refresh_timer = QTimer(self)
+        self._refresh_timer.setSingleShot(True)
+        self._refresh_timer.setInterval(REFRESH_COALESCE_MS)
+        self._refresh_timer.timeout.connect(self._apply_pending_updates)
+        self._date_rollover_timer = QTimer(self)
+        self._date_rollover_timer.setSingleShot(True)
+        self._date_rollover_timer.timeout.connect(self.on_date_rollover)
+
         self.init_ui()
         self.setup_tray_icon()
         self.update_date_list()
+        self._schedule_date_rollover()
+        QApplication.clipboard().dataChanged.connect(self._invalidate_image_copy)
+
+    @staticmethod
+    def _load_app_icon(path):
+        pixmap = QPixmap(path)
+        icon = QIcon(pixmap)
+        for size in APP_ICON_SIZES:
+            icon.addPixmap(pixmap.scaled(
+                size, size, Qt.AspectRatioMode.KeepAspectRatio,
+                Qt.TransformationMode.SmoothTransformation))
+        return icon
 
     def init_ui(self):
         main_widget = QWidget()
@@ -246,6 +858,13 @@ class ClipboardMainWindow(QMainWindow):
         self.search_bar.textChanged.connect(self.on_search_text_changed)
         top_level_layout.addWidget(self.search_bar)
 
+        self._search_query_lower = ""
+        self._search_timer = QTimer(self)
+        self._search_timer.setSingleShot(True)
+        self._search_timer.setInterval(SEARCH_DEBOUNCE_MS)
+        self._search_timer.timeout.connect(
+            lambda: self.perform_search(self.search_bar.text()))
+
         panes_layout = QHBoxLayout()
         top_level_layout.addLayout(panes_layout)
 
@@ -282,8 +901,12 @@ class ClipboardMainWindow(QMainWindow):
         history_heading = QLabel("History")
         history_heading.setFont(font)
 
-        self.history_list = QListWidget()
-        self.history_list.itemDoubleClicked.connect(
+        self.history_model = HistoryListModel(self.history_manager, self)
+        self.history_list = QListView()
+        self.history_list.setModel(self.history_model)
+        self.history_list.setItemDelegate(
+            HistoryItemDelegate(self.history_manager, self.history_list))
+        self.history_list.doubleClicked.connect(
             self.copy_item_to_clipboard)
 
         right_pane_layout.addWidget(history_heading)
@@ -297,132 +920,136 @@ class ClipboardMainWindow(QMainWindow):
         if text:
             self.date_list.setEnabled(False)
             self.clear_button.setEnabled(False)
-            self.perform_search(text)
+            self._search_timer.start()
         else:
+            self._search_timer.stop()
             self.date_list.setEnabled(True)
-            self.clear_button.setEnabled(self.date_list.currentItem() is not None)
+            self.clear_button.setEnabled(self._selected_date() is not None)
             self.update_history_view()
 
     def perform_search(self, query):
-        self.history_list.clear()
-        query_lower = query.lower()
-
-        all_items = []
-        for date_key in self.history_manager.get_all_dates():
-            all_items.extend(self.history_manager.get_history_for_date(date_key))
-
-        for timestamp_str, item_type, content in all_items:
-            if item_type == "text" and query_lower in content.lower():
-                item_time = datetime.fromisoformat(
-                    timestamp_str).strftime("%H:%M:%S")
-                self.add_text_item_to_list(item_time, content)
+        self._search_query_lower = query.lower()
+        self.history_model.set_rows(self.history_manager.search_text(query))
 
     def open_data_directory(self):
         QDesktopServices.openUrl(QUrl.fromLocalFile(self.app_data_dir))
 
-    def update_date_list(self):
-        current_selection = self.date_list.currentItem()
-        current_date_obj = current_selection.data(Qt.ItemDataRole.UserRole) if current_selection else None
+    def _schedule_date_rollover(self):
+        next_midnight = datetime.combine(
+            self._today + timedelta(days=1), datetime.min.time())
+        msecs = (next_midnight - datetime.now()).total_seconds() * 1000
+        self._date_rollover_timer.start(max(0, int(msecs)) + 1000)
+
+    def on_date_rollover(self):
+        self._today = datetime.now().date()
+        self.update_date_list()
+        self._schedule_date_rollover()
+
+    def _date_label(self, date_obj):
+        if date_obj == self._today:
+            return "Today"
+        if date_obj == self._today - timedelta(days=1):
+            return "Yesterday"
+        return self.history_manager.label_for(date_obj)
+
+    def _selected_date(self):
+        row = self.date_list.currentRow()
+        if 0 <= row < len(self._date_order):
+            return self._date_order[row]
+        return None
+
+    def _make_date_item(self, date_obj):
+        return QListWidgetItem(self._date_label(date_obj))
+
+    def _insert_date_item(self, date_obj):
+        row = bisect.bisect_left(
+            self._date_order, -date_obj.toordinal(), key=lambda d: -d.toordinal())
+        self._date_order.insert(row, date_obj)
+        self._known_dates.add(date_obj)
+        self.date_list.insertItem(row, self._make_date_item(date_obj))
+        if self.date_list.currentRow() < 0:
+            self.date_list.setCurrentRow(0)
 
-        self.date_list.clear()
+    def update_date_list(self):
+        current_date_obj = self._selected_date()
 
-        today = datetime.now().date()
         new_selection_item = None
 
-        for date_obj in self.history_manager.get_all_dates():
-            if date_obj == today:
-                date_str = "Today"
-            elif date_obj == today - timedelta(days=1):
-                date_str = "Yesterday"
-            else:
-                date_str = date_obj.strftime("%b %d, %Y")
+        self.date_list.setUpdatesEnabled(False)
+        self.date_list.blockSignals(True)
+        try:
+            self.date_list.clear()
+            self._date_order = self.history_manager.get_all_dates()
+            self._known_dates = set(self._date_order)
 
-            item = QListWidgetItem(date_str)
-            item.setData(Qt.ItemDataRole.UserRole, date_obj)
-            self.date_list.addItem(item)
+            for date_obj in self._date_order:
+                item = self._make_date_item(date_obj)
+                self.date_list.addItem(item)
 
-            if date_obj == current_date_obj:
-                new_selection_item = item
+                if date_obj == current_date_obj:
+                    new_selection_item = item
+        finally:
+            self.date_list.blockSignals(False)
+            self.date_list.setUpdatesEnabled(True)
 
         if new_selection_item:
             self.date_list.setCurrentItem(new_selection_item)
         elif self.date_list.count() > 0:
             self.date_list.setCurrentRow(0)
+        else:
+            self.update_history_view()
 
     def update_history_view(self, current_item=None, previous_item=None):
         if self.search_bar.text():
             return
-            
-        self.history_list.clear()
-        selected_item = self.date_list.currentItem()
-        self.clear_button.setEnabled(selected_item is not None)
 
-        if not selected_item:
-            return
+        selected_date = self._selected_date()
+        self.clear_button.setEnabled(selected_date is not None)
 
-        selected_date = selected_item.data(Qt.ItemDataRole.UserRole)
-        date_history = self.history_manager.get_history_for_date(selected_date)
+        if selected_date is None:
+            self.history_model.clear()
+            return
 
-        for timestamp_str, item_type, content in date_history:
-            item_time = datetime.fromisoformat(
-                timestamp_str).strftime("%H:%M:%S")
-            if item_type == "text":
-                self.add_text_item_to_list(item_time, content)
-            elif item_type == "image" and os.path.exists(content):
-                self.add_image_item_to_list(item_time, content)
+        self.history_model.set_rows(
+            self.history_manager.get_displayable_history_for_date(selected_date))
 
     def handle_new_item(self, timestamp_str, item_type, content):
-        new_item_date = datetime.fromisoformat(timestamp_str).date()
-
-        is_new_date = all(
-            self.date_list.item(i).data(Qt.ItemDataRole.UserRole) != new_item_date
-            for i in range(self.date_list.count())
-        )
-        
-        if is_new_date:
-            self.update_date_list()
+        self._pending_items.append(HistoryRow(timestamp_str, item_type, content))
+        if not self._refresh_timer.isActive():
+            self._refresh_timer.start()
+
+    def _apply_pending_updates(self):
+        pending_items, self._pending_items = self._pending_items, []
+        new_item_dates = set()
+
+        for row in pending_items:
+            new_item_date = date.fromisoformat(row.timestamp_iso[:10])
+            if not self.history_manager.get_history_for_date(new_item_date):
+                continue
+            new_item_dates.add(new_item_date)
+            if new_item_date not in self._known_dates:
+                if new_item_date > self._today:
+                    self._today = new_item_date
+                    self.update_date_list()
+                else:
+                    self._insert_date_item(new_item_date)
 
         if self.search_bar.text():
-            self.perform_search(self.search_bar.text())
+            if self._search_timer.isActive():
+                return
+            for row in pending_items:
+                if (row.item_type == "text"
+                        and self._search_query_lower in row.content.lower()):
+                    self.history_model.prepend_row(row)
         else:
-            current_item = self.date_list.currentItem()
-            if current_item and current_item.data(Qt.ItemDataRole.UserRole) == new_item_date:
+            if self._selected_date() in new_item_dates:
                 self.update_history_view()
 
-    def add_text_item_to_list(self, time_str, content):
-        display_text = (
-            content[:100] + '...') if len(content) > 100 else content
-        formatted_text = f"[{time_str}]\n{display_text.strip()}"
-        list_item = QListWidgetItem(formatted_text)
-        list_item.setData(Qt.ItemDataRole.UserRole, ("text", content))
-        list_item.setToolTip(content)
-        self.history_list.addItem(list_item)
-
-    def add_image_item_to_list(self, time_str, filepath):
-        pixmap = QPixmap(filepath).scaledToWidth(
-            200, Qt.TransformationMode.SmoothTransformation)
-        item_widget = QWidget()
-        item_layout = QVBoxLayout(item_widget)
-        item_layout.setContentsMargins(5, 5, 5, 5)
-        time_label = QLabel(f"[{time_str}]")
-        image_label = QLabel()
-        image_label.setPixmap(pixmap)
-        item_layout.addWidget(time_label)
-        item_layout.addWidget(image_label)
-
-        list_item = QListWidgetItem()
-        list_item.setData(Qt.ItemDataRole.UserRole, ("image", filepath))
-        list_item.setToolTip("Double-click to copy image")
-        list_item.setSizeHint(item_widget.sizeHint())
-        self.history_list.addItem(list_item)
-        self.history_list.setItemWidget(list_item, item_widget)
-
     def show_date_list_context_menu(self, pos):
         context_menu = QMenu()
         clear_selected_action = context_menu.addAction("Clear Selected Date")
         clear_all_action = context_menu.addAction("Clear All Session History")
-        clear_selected_action.setEnabled(
-            self.date_list.currentItem() is not None)
+        clear_selected_action.setEnabled(self._selected_date() is not None)
         action = context_menu.exec(self.date_list.mapToGlobal(pos))
         if action == clear_selected_action:
             self.clear_selected_date()
@@ -430,12 +1057,11 @@ class ClipboardMainWindow(QMainWindow):
             self.clear_all_history()
 
     def clear_selected_date(self):
-        selected_item = self.date_list.currentItem()
-        if not selected_item:
+        date_obj = self._selected_date()
+        if date_obj is None:
             return
 
-        date_obj = selected_item.data(Qt.ItemDataRole.UserRole)
-        date_str = "Today" if date_obj == datetime.now().date() else date_obj.strftime("%b %d, %Y")
+        date_str = "Today" if date_obj == datetime.now().date() else self.history_manager.label_for(date_obj)
 
         reply = QMessageBox.question(self, 'Confirm Deletion',
                                      f"Are you sure you want to permanently delete all history for {date_str}?",
@@ -447,7 +1073,7 @@ class ClipboardMainWindow(QMainWindow):
 
             if success:
                 self.update_date_list()
-                self.history_list.clear()
+                self.history_model.clear()
             else:
                 QMessageBox.critical(self, "Error Deleting History",
                     "Could not save the changes to the history file.\n\n"
@@ -463,16 +1089,46 @@ class ClipboardMainWindow(QMainWindow):
             self.history_manager.clear_all()
             self.update_date_list()
 
-    def copy_item_to_clipboard(self, item):
-        if not item:
+    def copy_item_to_clipboard(self, index):
+        if not index.isValid():
             return
-        item_type, content = item.data(Qt.ItemDataRole.UserRole)
+        item_type, content = index.data(Qt.ItemDataRole.UserRole)
+        self._invalidate_image_copy()
         clipboard = QApplication.clipboard()
         if item_type == "text":
             clipboard.setText(content)
-        elif item_type == "image" and os.path.exists(content):
-            clipboard.setImage(QImage(content))
+        elif item_type == "image":
+            try:
+                stat = os.stat(content)
+            except OSError:
+                stat = None
+            if stat is not None and stat.st_size > ASYNC_IMAGE_LOAD_BYTES:
+                task = ImageLoadTask(
+                    self._image_copy_token, content, stat.st_mtime_ns)
+                task.signals.loaded.connect(self.on_full_image_loaded)
+                self._image_load_signals.add(task.signals)
+                QThreadPool.globalInstance().start(task)
+                return
+            if stat is not None:
+                clipboard.setImage(load_full_image(content, stat.st_mtime_ns))
+
+        self.show_copied_message()
+
+    def _invalidate_image_copy(self):
+        self._image_copy_token += 1
+
+    def on_full_image_loaded(self, copy_token, filepath, image):
+        self._image_load_signals.discard(self.sender())
+        if copy_token != self._image_copy_token:
+            # Something else was copied while this image was decoding.
+            return
+        if image.isNull():
+            print(f"Error loading image {filepath}")
+            return
+        QApplication.clipboard().setImage(image)
+        self.show_copied_message()
 
+    def show_copied_message(self):
         self.tray_icon.showMessage(
             "Copied", "Item copied to clipboard!", self.app_icon, 1500)
 
@@ -504,8 +1160,8 @@ class ClipboardMainWindow(QMainWindow):
         self.hide()
 
     def quit_app(self):
-        self.monitor_thread.stop() # type: ignore
-        self.monitor_thread.wait() # type: ignore
+        QThreadPool.globalInstance().waitForDone()
+        self.history_manager.close()
         QApplication.instance().quit() # type: ignore
 
 
@@ -517,17 +1173,16 @@ if __name__ == "__main__":
     app_data_dir = os.path.join(script_dir, "data")
 
     images_dir = os.path.join(app_data_dir, "images")
+    thumbs_dir = os.path.join(app_data_dir, "thumbs")
     csv_path = os.path.join(app_data_dir, "history.csv")
 
-    history_manager = HistoryManager(csv_path=csv_path, images_dir=images_dir)
+    history_manager = HistoryManager(
+        csv_path=csv_path, images_dir=images_dir, thumbs_dir=thumbs_dir)
 
     main_win = ClipboardMainWindow(history_manager, app_data_dir)
 
-    monitor_thread = ClipboardMonitor(history_manager, images_dir)
-    monitor_thread.newItem.connect(main_win.handle_new_item)
-    main_win.monitor_thread = monitor_thread # type: ignore
-
-    monitor_thread.start()
+    monitor = ClipboardMonitor(history_manager, images_dir)
+    monitor.newItem.connect(main_win.handle_new_item)
 
     main_win.show()
     sys.exit(app.exec())
\ No newline at end of file